@@ -1,82 +1,63 @@
-import yfinance as yf
-from fastapi import FastAPI, Request
-from pydantic import BaseModel
-import uvicorn
+from fastapi import FastAPI, Request, Response
+import msgspec
 from typing import Dict, Any, Optional, Union, List
-import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import os
+import sys
 
+from tools_impl import (
+    fetch_news_sentiment,
+    fetch_technical_analysis,
+    fetch_technical_analysis_batch,
+    full_analysis
+)
 
-def fetch_news_sentiment(ticker_symbol):
-    """Fetch news articles for a given ticker symbol"""
-    try:
-        ticker = yf.Ticker(ticker_symbol)
-        news = ticker.news
+# Yahoo fetches block, so they run on the loop's default executor
+FETCH_THREADS = 32
 
-        if not news:
-            return "No recent news available for this ticker."
+# Batch items handled concurrently, kept below FETCH_THREADS so one large
+# batch cannot occupy every fetch thread
+BATCH_CONCURRENCY = 20
 
-        articles = []
-        for i in range(len(news)):
-            title = news[i].get('content', {}).get('title', '')
-            summary = news[i].get('content', {}).get('summary', '')
-            articles.append(f"Article #{i + 1}. {title} - {summary}")
 
-        return articles
-    except Exception as e:
-        return f"Error fetching news articles: {str(e)}"
+@asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=FETCH_THREADS)
+    loop.set_default_executor(executor)
+    yield
+    executor.shutdown(wait=False)
 
 
-def fetch_technical_analysis(ticker_symbol):
-    """Fetch technical analysis indicators for a given ticker symbol"""
-    try:
-        data = yf.download(ticker_symbol, period="1y")
-        data.reset_index(inplace=True)
-
-        data["SMA50"] = data["Close"].rolling(window=50).mean()
-        data["SMA200"] = data["Close"].rolling(window=200).mean()
-
-        delta = data["Close"].diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        data["RSI"] = 100 - (100 / (1 + rs))
-
-        exp1 = data["Close"].ewm(span=12, adjust=False).mean()
-        exp2 = data["Close"].ewm(span=26, adjust=False).mean()
-        data["MACD"] = exp1 - exp2
-        data["MACD_signal"] = data["MACD"].ewm(span=9, adjust=False).mean()
-        data["MACD_hist"] = data["MACD"] - data["MACD_signal"]
-
-        latest = data.iloc[-1]
-        indicators = latest[["SMA50", "SMA200", "RSI", "MACD", "MACD_signal", "MACD_hist"]]
-        return indicators.to_dict()
-    except Exception as e:
-        return f"Error fetching technical analysis: {str(e)}"
+app = FastAPI(title="Financial Analysis MCP Server", lifespan=lifespan)
 
-app = FastAPI(title="Financial Analysis MCP Server")
 
-class JSONRPCRequest(BaseModel):
+class JSONRPCRequest(msgspec.Struct, kw_only=True):
     jsonrpc: str = "2.0"
     id: Union[str, int, None] = None
     method: str
     params: Optional[Dict[str, Any]] = None
 
 
-class JSONRPCError(BaseModel):
+class JSONRPCError(msgspec.Struct, omit_defaults=True):
     code: int
     message: str
     data: Optional[Any] = None
 
 
-class JSONRPCResponse(BaseModel):
-    jsonrpc: str = "2.0"
+# "jsonrpc" is encoded as the struct tag so omit_defaults never drops it
+class JSONRPCResponse(msgspec.Struct, omit_defaults=True, tag_field="jsonrpc", tag="2.0"):
     id: Union[str, int, None] = None
     result: Optional[Any] = None
     error: Optional[JSONRPCError] = None
 
 
+_REQUEST_DECODER = msgspec.json.Decoder(Union[JSONRPCRequest, List[Any]])
+_ENCODER = msgspec.json.Encoder()
+
+
 # MCP Tool definitions
 TOOLS = [
     {
@@ -106,96 +87,167 @@ TOOLS = [
             },
             "required": ["ticker_symbol"]
         }
+    },
+    {
+        "name": "batch_technical_analysis_tool",
+        "description": "Perform technical analysis for several stock tickers in one call",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "ticker_symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Stock ticker symbols (e.g., ['AAPL', 'MSFT'])"
+                }
+            },
+            "required": ["ticker_symbols"]
+        }
+    },
+    {
+        "name": "full_analysis_tool",
+        "description": "Get both news sentiment and technical analysis for a given stock ticker in one call",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "ticker_symbol": {
+                    "type": "string",
+                    "description": "Stock ticker symbol (e.g., 'AAPL', 'MSFT')"
+                }
+            },
+            "required": ["ticker_symbol"]
+        }
     }
 ]
 
 
-def handle_list_tools(request_id):
-    """Handle tools/list request"""
+SERVER_INFO = {
+    "name": "financial-analysis-server",
+    "version": "1.0.0"
+}
+
+# Static payloads are serialized once at import and embedded verbatim
+# when the response envelope is encoded.
+_TOOLS_LIST_RESULT = msgspec.Raw(_ENCODER.encode({"tools": TOOLS}))
+_INITIALIZE_RESULT = msgspec.Raw(_ENCODER.encode({
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": SERVER_INFO
+}))
+_HEALTH_JSON = _ENCODER.encode({"status": "healthy", "server": SERVER_INFO["name"]})
+_INFO_JSON = _ENCODER.encode({
+    **SERVER_INFO,
+    "description": "MCP server for financial analysis",
+    "protocol": "JSON-RPC 2.0",
+    "transport": "Streamable HTTP",
+    "endpoints": {
+        "mcp": "/mcp",
+        "health": "/health"
+    }
+})
+
+
+def _json_response(payload):
+    return Response(content=_ENCODER.encode(payload), media_type="application/json")
+
+
+def _tool_payload(ticker_symbol, **results):
+    """Collect fetch results for a ticker, moving error strings under "errors"."""
+    payload = {"ticker": ticker_symbol}
+    for key, result in results.items():
+        if isinstance(result, str):
+            payload.setdefault("errors", []).append(result)
+        else:
+            payload[key] = result
+    return payload
+
+
+def _tool_result(request_id, payload):
+    """Wrap a tool payload as JSON text content in a JSON-RPC response"""
     return JSONRPCResponse(
         id=request_id,
-        result={"tools": TOOLS}
+        result={
+            "content": [{
+                "type": "text",
+                "text": _ENCODER.encode(payload).decode()
+            }]
+        }
     )
 
 
-def handle_call_tool(request_id, params):
-    """Handle tools/call request"""
-    try:
-        tool_name = params.get("name")
-        arguments = params.get("arguments", {})
+def handle_list_tools(request_id):
+    """Handle tools/list request"""
+    return JSONRPCResponse(id=request_id, result=_TOOLS_LIST_RESULT)
 
-        if tool_name == "news_sentiment_tool":
-            ticker_symbol = arguments.get("ticker_symbol")
-            if not ticker_symbol:
-                return JSONRPCResponse(
-                    id=request_id,
-                    error=JSONRPCError(code=-32602, message="ticker_symbol is required")
-                )
 
-            result = fetch_news_sentiment(ticker_symbol)
-            return JSONRPCResponse(
-                id=request_id,
-                result={
-                    "content": [{
-                        "type": "text",
-                        "text": f"News sentiment analysis for {ticker_symbol}: {result}"
-                    }]
-                }
-            )
+async def _news_sentiment(ticker_symbol):
+    result = await asyncio.to_thread(fetch_news_sentiment, ticker_symbol)
+    return _tool_payload(ticker_symbol, articles=result)
 
-        elif tool_name == "technical_analysis_tool":
-            ticker_symbol = arguments.get("ticker_symbol")
-            if not ticker_symbol:
-                return JSONRPCResponse(
-                    id=request_id,
-                    error=JSONRPCError(code=-32602, message="ticker_symbol is required")
-                )
 
-            result = fetch_technical_analysis(ticker_symbol)
-            return JSONRPCResponse(
-                id=request_id,
-                result={
-                    "content": [{
-                        "type": "text",
-                        "text": f"Technical analysis for {ticker_symbol}: {result}"
-                    }]
-                }
-            )
+async def _technical_analysis(ticker_symbol):
+    result = await asyncio.to_thread(fetch_technical_analysis, ticker_symbol)
+    return _tool_payload(ticker_symbol, indicators=result)
+
+
+async def _batch_technical_analysis(ticker_symbols):
+    results = await asyncio.to_thread(fetch_technical_analysis_batch, ticker_symbols)
+    return [_tool_payload(symbol, indicators=result) for symbol, result in results.items()]
+
+
+async def _full_analysis(ticker_symbol):
+    news, technical = await full_analysis(ticker_symbol)
+    return _tool_payload(ticker_symbol, articles=news, indicators=technical)
 
-        else:
-            return JSONRPCResponse(
-                id=request_id,
-                error=JSONRPCError(code=-32601, message=f"Unknown tool: {tool_name}")
-            )
+
+# tool name -> (argument name, argument type, handler)
+_DISPATCH = {
+    "news_sentiment_tool": ("ticker_symbol", str, _news_sentiment),
+    "technical_analysis_tool": ("ticker_symbol", str, _technical_analysis),
+    "batch_technical_analysis_tool": ("ticker_symbols", list, _batch_technical_analysis),
+    "full_analysis_tool": ("ticker_symbol", str, _full_analysis)
+}
+
+
+def _error(request_id, code, message):
+    return JSONRPCResponse(id=request_id, error=JSONRPCError(code=code, message=message))
+
+
+async def handle_call_tool(request_id, params):
+    """Handle tools/call request"""
+    try:
+        tool_name = params.get("name")
+        tool = _DISPATCH.get(tool_name)
+        if tool is None:
+            return _error(request_id, -32601, f"Unknown tool: {tool_name}")
+
+        argument_name, argument_type, handler = tool
+        argument = params.get("arguments", {}).get(argument_name)
+        if not argument:
+            return _error(request_id, -32602, f"{argument_name} is required")
+        if not isinstance(argument, argument_type):
+            return _error(request_id, -32602, f"{argument_name} must be a {argument_type.__name__}")
+        if argument_type is list and not all(isinstance(item, str) and item for item in argument):
+            return _error(request_id, -32602, f"{argument_name} must contain only non-empty strings")
+
+        return _tool_result(request_id, await handler(argument))
 
     except Exception as e:
-        return JSONRPCResponse(
-            id=request_id,
-            error=JSONRPCError(code=-32603, message=f"Internal error: {str(e)}")
-        )
+        return _error(request_id, -32603, f"Internal error: {str(e)}")
 
 
 def handle_initialize(request_id, params):
     """Handle initialize request"""
-    return JSONRPCResponse(
-        id=request_id,
-        result={
-            "protocolVersion": "2024-11-05",
-            "capabilities": {
-                "tools": {}
-            },
-            "serverInfo": {
-                "name": "financial-analysis-server",
-                "version": "1.0.0"
-            }
-        }
-    )
+    return JSONRPCResponse(id=request_id, result=_INITIALIZE_RESULT)
 
 
-def handle_single_request(body):
+async def handle_single_request(body):
     """Handle a single JSON-RPC request"""
     try:
-        rpc_request = JSONRPCRequest(**body)
+        if not isinstance(body, JSONRPCRequest):
+            body = msgspec.convert(body, JSONRPCRequest)
+        rpc_request = body
 
         if rpc_request.method == "initialize":
             return handle_initialize(rpc_request.id, rpc_request.params or {})
@@ -204,7 +256,7 @@ def handle_single_request(body):
             return handle_list_tools(rpc_request.id)
 
         elif rpc_request.method == "tools/call":
-            return handle_call_tool(rpc_request.id, rpc_request.params or {})
+            return await handle_call_tool(rpc_request.id, rpc_request.params or {})
 
         else:
             return JSONRPCResponse(
@@ -212,84 +264,91 @@ def handle_single_request(body):
                 error=JSONRPCError(code=-32601, message=f"Method not found: {rpc_request.method}")
             )
 
+    except msgspec.ValidationError as e:
+        return JSONRPCResponse(
+            error=JSONRPCError(code=-32600, message=f"Invalid Request: {str(e)}")
+        )
     except Exception as e:
         return JSONRPCResponse(
             error=JSONRPCError(code=-32603, message=f"Internal error: {str(e)}")
         )
 
 
+async def handle_batch_request(body):
+    """Handle a JSON-RPC batch, running up to BATCH_CONCURRENCY requests at once"""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def handle(req):
+        async with semaphore:
+            return await handle_single_request(req)
+
+    responses = await asyncio.gather(*(handle(req) for req in body), return_exceptions=True)
+    return [
+        _error(None, -32603, f"Internal error: {str(response)}")
+        if isinstance(response, Exception) else response
+        for response in responses
+    ]
+
+
 @app.post("/mcp")
 @app.post("/")
 async def mcp_endpoint(request: Request):
     """Single MCP endpoint for all JSON-RPC communication"""
     try:
-        body = await request.json()
+        body = _REQUEST_DECODER.decode(await request.body())
 
         # Handle single request
-        if isinstance(body, dict):
-            response = handle_single_request(body)
-            if isinstance(response, JSONRPCResponse):
-                response_dict = response.model_dump(exclude_none=True)
-                return response_dict
-            return response
-
-        # Handle batch requests
-        elif isinstance(body, list):
-            responses = []
-            for req in body:
-                response = handle_single_request(req)
-                if isinstance(response, JSONRPCResponse):
-                    responses.append(response.model_dump(exclude_none=True))
-                else:
-                    responses.append(response)
-            return responses
-
-        else:
-            error_response = JSONRPCResponse(
-                error=JSONRPCError(code=-32700, message="Parse error")
-            )
-            return error_response.model_dump(exclude_none=True)
-
-    except json.JSONDecodeError:
-        error_response = JSONRPCResponse(
+        if isinstance(body, JSONRPCRequest):
+            return _json_response(await handle_single_request(body))
+
+        # Handle batch requests, encoded as one array in a single pass
+        return _json_response(await handle_batch_request(body))
+
+    except msgspec.ValidationError as e:
+        return _json_response(JSONRPCResponse(
+            error=JSONRPCError(code=-32600, message=f"Invalid Request: {str(e)}")
+        ))
+    except msgspec.DecodeError:
+        return _json_response(JSONRPCResponse(
             error=JSONRPCError(code=-32700, message="Parse error")
-        )
-        return error_response.model_dump(exclude_none=True)
+        ))
     except Exception as e:
-        error_response = JSONRPCResponse(
+        return _json_response(JSONRPCResponse(
             error=JSONRPCError(code=-32603, message=f"Internal error: {str(e)}")
-        )
-        return error_response.model_dump(exclude_none=True)
+        ))
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "server": "financial-analysis-server"}
+    return Response(content=_HEALTH_JSON, media_type="application/json")
 
 
 @app.get("/info")
 async def info():
-    return {
-        "name": "financial-analysis-server",
-        "version": "1.0.0",
-        "description": "MCP server for financial analysis",
-        "protocol": "JSON-RPC 2.0",
-        "transport": "Streamable HTTP",
-        "endpoints": {
-            "mcp": "/mcp",
-            "health": "/health"
-        }
-    }
+    return Response(content=_INFO_JSON, media_type="application/json")
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     print("Starting Financial Analysis MCP Server...")
     print("Available tools:")
     print("  - news_sentiment_tool: Get news articles and sentiment for a ticker")
     print("  - technical_analysis_tool: Get technical indicators and trend analysis")
+    print("  - batch_technical_analysis_tool: Get technical indicators for several tickers at once")
+    print("  - full_analysis_tool: Get news articles and technical indicators concurrently")
     print("\nMCP endpoint: /mcp (JSON-RPC 2.0)")
     print("Health check: /health")
     print("Info: /info")
     print("\nStarting server on http://0.0.0.0:8000")
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Worker processes need the app as an import string. Each worker keeps
+    # its own ticker cache.
+    uvicorn.run(
+        "mcp_server:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=os.cpu_count() or 1
+    )
\ No newline at end of file
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Union
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult, TerminationCondition
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent
+from autogen_core import CancellationToken
+
+NodeResult = Union[TaskResult, BaseException]
+
+# Streamed between the turns of a node that takes more than one
+TURN_SEPARATOR = "\n\n"
+
+
+class AgentDAG:
+    """
+    Runs agents in dependency order, running agents with no pending
+    dependencies concurrently.
+
+    An agent with dependencies receives the task followed by the final message
+    of each agent it depends on.
+    """
+
+    def __init__(
+            self,
+            agents: Dict[str, AssistantAgent],
+            deps: Dict[str, Set[str]],
+            terminations: Optional[Dict[str, TerminationCondition]] = None,
+            max_turns: int = 1
+    ):
+        """
+        Args:
+            agents: Agents by node name
+            deps: Node name -> names of the nodes whose output it needs
+            terminations: Node name -> condition that must be met before the node
+                is done; such a node keeps taking turns until then
+            max_turns: Maximum number of turns for a node with a termination condition
+        """
+        self.agents = agents
+        self.deps = {name: set(deps.get(name, ())) for name in agents}
+        self.terminations = terminations or {}
+        self.max_turns = max_turns
+        self.phases = self._phases()
+
+    def _phases(self) -> List[List[str]]:
+        """Group the nodes into phases, each depending only on earlier phases."""
+        phases = []
+        done: Set[str] = set()
+        while len(done) < len(self.agents):
+            ready = [name for name in self.agents if name not in done and self.deps[name] <= done]
+            if not ready:
+                raise ValueError(f"Dependency cycle among agents: {sorted(set(self.agents) - done)}")
+            phases.append(ready)
+            done.update(ready)
+        return phases
+
+    async def reset(self) -> None:
+        """Clear every agent's conversation history."""
+        for agent in self.agents.values():
+            await agent.on_reset(CancellationToken())
+
+    @staticmethod
+    def _context_task(task: str, inputs: Dict[str, NodeResult]) -> str:
+        sections = [task]
+        for name, result in inputs.items():
+            if isinstance(result, BaseException):
+                text = f"(analysis unavailable: {str(result)})"
+            else:
+                text = result.messages[-1].to_text()
+            sections.append(f"{name}:\n{text}")
+        return "\n\n".join(sections)
+
+    @staticmethod
+    async def _agent_turn(
+            agent: AssistantAgent,
+            task: Optional[str],
+            chunks: Optional["asyncio.Queue[str]"]
+    ) -> TaskResult:
+        if chunks is None:
+            return await agent.run(task=task)
+
+        result = None
+        async for event in agent.run_stream(task=task):
+            if isinstance(event, ModelClientStreamingChunkEvent):
+                chunks.put_nowait(event.content)
+            elif isinstance(event, TaskResult):
+                result = event
+        return result
+
+    async def _run_node(self, name: str, task: str, chunks: Optional["asyncio.Queue[str]"] = None) -> TaskResult:
+        agent = self.agents[name]
+        result = await self._agent_turn(agent, task, chunks)
+
+        termination = self.terminations.get(name)
+        if termination is None:
+            return result
+
+        await termination.reset()
+        messages = list(result.messages)
+        stop = await termination(result.messages)
+        turns = 1
+        while stop is None and turns < self.max_turns:
+            if chunks is not None:
+                chunks.put_nowait(TURN_SEPARATOR)
+            result = await self._agent_turn(agent, None, chunks)
+            messages.extend(result.messages)
+            stop = await termination(result.messages)
+            turns += 1
+
+        stop_reason = stop.content if stop is not None else f"Maximum number of turns {self.max_turns} reached."
+        return TaskResult(messages=messages, stop_reason=stop_reason)
+
+    async def _run_node_isolated(self, name: str, task: str, chunks: Optional["asyncio.Queue[str]"]) -> NodeResult:
+        """Run a node, returning its exception so it does not cancel the rest of its phase."""
+        try:
+            return await self._run_node(name, task, chunks)
+        except Exception as e:
+            return e
+
+    async def run(self, task: str, chunks: Optional["asyncio.Queue[str]"] = None) -> Dict[str, NodeResult]:
+        """
+        Run every agent on the task.
+
+        Args:
+            task: Task given to every agent
+            chunks: If given, model output tokens of the final phase's agents are
+                put on this queue as they arrive, with TURN_SEPARATOR between the
+                turns of one agent; their agents must be created with
+                model_client_stream=True
+
+        Returns:
+            Node name -> its result, or the exception it raised
+        """
+        results: Dict[str, NodeResult] = {}
+        for index, phase in enumerate(self.phases):
+            phase_chunks = chunks if index == len(self.phases) - 1 else None
+            tasks = [
+                self._context_task(task, {
+                    self.agents[dep].name: results[dep] for dep in sorted(self.deps[name])
+                })
+                if self.deps[name] else task
+                for name in phase
+            ]
+            # Cancelling the run (e.g. on timeout) cancels every node in the phase
+            async with asyncio.TaskGroup() as group:
+                node_runs = [
+                    group.create_task(self._run_node_isolated(name, node_task, phase_chunks))
+                    for name, node_task in zip(phase, tasks)
+                ]
+            results.update((name, node_run.result()) for name, node_run in zip(phase, node_runs))
+        return results
@@ -7,8 +7,14 @@ and technical indicators through AutoGen and MCP.
 
 from multi_agent_system import MultiAgentSystem
 from agents import AgentFactory
+from agent_dag import AgentDAG
 from mcp_executor import MCPToolExecutor, get_mcp_executor
-from tools import news_sentiment_tool, technical_analysis_tool
+from tools import (
+    news_sentiment_tool,
+    technical_analysis_tool,
+    batch_technical_analysis_tool,
+    full_analysis_tool
+)
 
 __version__ = "1.0.0"
 __author__ = "Federico Mazzoni"
@@ -17,8 +23,11 @@ __email__ = "mazzoni.federico1@gmail.com"
 __all__ = [
     "MultiAgentSystem",
     "AgentFactory", 
+    "AgentDAG",
     "MCPToolExecutor",
     "get_mcp_executor",
     "news_sentiment_tool",
-    "technical_analysis_tool"
+    "technical_analysis_tool",
+    "batch_technical_analysis_tool",
+    "full_analysis_tool"
 ]
\ No newline at end of file
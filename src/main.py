@@ -1,6 +1,9 @@
 import asyncio
 import os
 import argparse
+import logging
+import logging.handlers
+import queue
 from multi_agent_system import MultiAgentSystem
 
 
@@ -15,6 +18,7 @@ Examples:
     python main.py --model gpt-4       # Use GPT-4 model
     python main.py --server-url http://localhost:8001  # Custom server URL
     python main.py --ticker TSLA       # Analyze TSLA
+    python main.py --stream            # Print the orchestrator's output as it is generated
     python main.py --model gpt-3.5-turbo --ticker MSFT --server-url http://localhost:9000
         """
     )
@@ -39,6 +43,11 @@ Examples:
         default=6,
         help="Maximum number of conversation turns (default: 6)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the orchestrator's output, ending with the final verdict, as it is generated"
+    )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -47,6 +56,26 @@ Examples:
     return parser.parse_args()
 
 
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Send log records through a queue to a listener thread that writes them,
+    so logging from the event loop never blocks on the terminal.
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    # Only our own progress messages at INFO; autogen logs every event at INFO
+    root = logging.getLogger()
+    root.setLevel(logging.WARNING)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    logging.getLogger("multi_agent_system").setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(log_queue, console)
+    listener.start()
+    return listener
+
+
 async def main():
     """Main entry point for the financial analysis system."""
     args = parse_arguments()
@@ -72,10 +101,16 @@ async def main():
             print(f"Target Ticker: {args.ticker}")
             print("=" * 40)
 
-        result = await system.analyze_stock(args.ticker)
-        final_verdict = dict(result)['messages'][-1].content
-        print(f"\nFinal Result for {args.ticker}:")
-        print(final_verdict)
+        if args.stream:
+            print(f"\nFinal Result for {args.ticker}:")
+            async for chunk in system.analyze_stock_stream(args.ticker):
+                print(chunk, end="", flush=True)
+            print()
+        else:
+            result = await system.analyze_stock(args.ticker)
+            final_verdict = dict(result)['messages'][-1].content
+            print(f"\nFinal Result for {args.ticker}:")
+            print(final_verdict)
 
     except KeyboardInterrupt:
         print("\nAnalysis interrupted by user")
@@ -89,6 +124,7 @@ async def main():
                 print(f"Error during cleanup: {str(e)}")
 
 if __name__ == "__main__":
+    listener = setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -97,4 +133,6 @@ if __name__ == "__main__":
         print(f"Fatal error: {e}")
         import traceback
 
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+    finally:
+        listener.stop()
\ No newline at end of file
@@ -1,73 +1,118 @@
 import asyncio
+import itertools
+import logging
 import os
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 import httpx
+import msgspec
+
+# Immutable part of every tools/call request; only "id" and "params" vary
+_RPC_TEMPLATE = {"jsonrpc": "2.0", "id": 0, "method": "tools/call", "params": None}
+_RPC_IDS = itertools.count(1)
+_JSON_HEADERS = {"content-type": "application/json"}
+
+DEFAULT_POOL_SIZE = 20
+
+logger = logging.getLogger(__name__)
 
 class MCPToolExecutor:
     """
     Handles communication with MCP server for tool execution.
     """
-    def __init__(self, server_url: str = "http://localhost:8000"):
+    def __init__(self, server_url: str = "http://localhost:8000", pool_size: int = DEFAULT_POOL_SIZE):
         self.server_url = server_url
+        self.pool_size = pool_size
         self.client = None
         self._client_lock = asyncio.Lock()
 
     async def ensure_connection(self) -> None:
         """Ensure we have a valid connection to the MCP server."""
+        # Fast path for every call after the first; the lock only guards creation
+        if self.client is not None and not self.client.is_closed:
+            return
         async with self._client_lock:
             if self.client is None or self.client.is_closed:
-                import httpx
                 self.client = httpx.AsyncClient(
                     base_url=self.server_url,
-                    timeout=30.0
+                    timeout=30.0,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                        keepalive_expiry=60.0
+                    )
                 )
 
+    def _rpc_request(self, name: str, arguments: dict) -> dict:
+        rpc_request = _RPC_TEMPLATE.copy()
+        rpc_request["id"] = next(_RPC_IDS)
+        rpc_request["params"] = {"name": name, "arguments": arguments}
+        return rpc_request
+
+    async def _post(self, payload: Any) -> Any:
+        await self.ensure_connection()
+        response = await self.client.post(
+            "/mcp", content=msgspec.json.encode(payload), headers=_JSON_HEADERS
+        )
+        response.raise_for_status()
+        return msgspec.json.decode(response.content)
+
+    @staticmethod
+    def _parse_response(rpc_response: Any) -> str:
+        """Extract the tool's text output, or an error message, from a JSON-RPC response."""
+        if rpc_response is None:
+            return "Error: Received None response from MCP server"
+
+        if "error" in rpc_response and rpc_response["error"] is not None:
+            error_info = rpc_response["error"]
+            if isinstance(error_info, dict):
+                error_message = error_info.get('message', 'Unknown error')
+                error_code = error_info.get('code', 'Unknown code')
+                return f"MCP Error [{error_code}]: {error_message}"
+            else:
+                return f"MCP Error: {error_info}"
+
+        result = rpc_response.get("result")
+        if result is None:
+            return "Error: No result field in MCP response"
+
+        content = result.get("content", [])
+
+        if content and len(content) > 0:
+            first_content = content[0]
+            if first_content and isinstance(first_content, dict):
+                text_content = first_content.get("text", "No text content available")
+                return text_content
+            else:
+                return f"Unexpected content format: {first_content}"
+
+        return f"No content returned. Full result: {result}"
+
     async def call_tool(self, name: str, arguments: dict) -> str:
         """
         Call a tool on the MCP server using JSON-RPC 2.0.
         """
-        rpc_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": name,
-                "arguments": arguments
-            }
-        }
-
-        async with httpx.AsyncClient(base_url=self.server_url) as client:
-            response = await client.post("/mcp", json=rpc_request)
-            response.raise_for_status()
-            rpc_response = response.json()
-
-            if rpc_response is None:
-                return "Error: Received None response from MCP server"
-
-            if "error" in rpc_response and rpc_response["error"] is not None:
-                error_info = rpc_response["error"]
-                if isinstance(error_info, dict):
-                    error_message = error_info.get('message', 'Unknown error')
-                    error_code = error_info.get('code', 'Unknown code')
-                    return f"MCP Error [{error_code}]: {error_message}"
-                else:
-                    return f"MCP Error: {error_info}"
+        return self._parse_response(await self._post(self._rpc_request(name, arguments)))
 
-            result = rpc_response.get("result")
-            if result is None:
-                return "Error: No result field in MCP response"
-
-            content = result.get("content", [])
-
-            if content and len(content) > 0:
-                first_content = content[0]
-                if first_content and isinstance(first_content, dict):
-                    text_content = first_content.get("text", "No text content available")
-                    return text_content
-                else:
-                    return f"Unexpected content format: {first_content}"
+    async def call_tools_batch(self, calls: List[Tuple[str, dict]]) -> List[str]:
+        """
+        Call several tools in one round-trip using a JSON-RPC 2.0 batch.
 
-            return f"No content returned. Full result: {result}"
+        Results are returned in the order of `calls`.
+        """
+        if len(calls) == 1:
+            return [await self.call_tool(*calls[0])]
+
+        rpc_requests = [self._rpc_request(name, arguments) for name, arguments in calls]
+        rpc_responses = await self._post(rpc_requests)
+        if not isinstance(rpc_responses, list):
+            # The server answers a batch it cannot process with a single error
+            return [self._parse_response(rpc_responses)] * len(calls)
+
+        by_id = {
+            rpc_response.get("id"): rpc_response
+            for rpc_response in rpc_responses if isinstance(rpc_response, dict)
+        }
+        return [self._parse_response(by_id.get(rpc_request["id"])) for rpc_request in rpc_requests]
 
 
     async def disconnect(self) -> None:
@@ -81,12 +126,25 @@ class MCPToolExecutor:
 # Global instance
 _mcp_executor: Optional[MCPToolExecutor] = None
 
-def get_mcp_executor() -> MCPToolExecutor:
-    """Get or create the global MCP executor instance."""
+def get_mcp_executor(pool_size: Optional[int] = None) -> MCPToolExecutor:
+    """
+    Get or create the global MCP executor instance.
+
+    Args:
+        pool_size: Connection pool size for a newly created executor (if None,
+            will use the MCP_POOL_SIZE environment variable or default)
+    """
     global _mcp_executor
     if _mcp_executor is None:
         server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8000")
-        _mcp_executor = MCPToolExecutor(server_url=server_url)
+        if pool_size is None:
+            pool_size = int(os.getenv("MCP_POOL_SIZE", DEFAULT_POOL_SIZE))
+        _mcp_executor = MCPToolExecutor(server_url=server_url, pool_size=pool_size)
+    elif pool_size is not None and pool_size != _mcp_executor.pool_size:
+        logger.warning(
+            "MCP executor already exists with pool size %d; requested size %d is ignored",
+            _mcp_executor.pool_size, pool_size
+        )
     return _mcp_executor
 
 
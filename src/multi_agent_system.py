@@ -1,11 +1,108 @@
+import asyncio
+import logging
 import os
-from typing import Optional, List, Dict, Any
+import ssl
+import time
+from collections import OrderedDict
+import httpx
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Union
 from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
+from autogen_agentchat.base import TaskResult
 from autogen_agentchat.conditions import TextMentionTermination
+from autogen_core import CacheStore
+from autogen_ext.models.cache import CHAT_CACHE_VALUE_TYPE, ChatCompletionCache
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from agents import AgentFactory
-from mcp_executor import cleanup_mcp_executor
+from agent_dag import AgentDAG
+from mcp_executor import cleanup_mcp_executor, get_mcp_executor
+
+logger = logging.getLogger(__name__)
+
+# Seconds an analysis may take per orchestrator turn before it is cancelled
+TIMEOUT_PER_TURN = 30
+
+# Built once: creating an SSL context loads the CA bundle from disk
+_SSL_CONTEXT = ssl.create_default_context()
+
+
+class _SharedModelClient:
+    """A model client and its connection pool, shared by every system using them."""
+
+    def __init__(
+            self,
+            model_name: str,
+            api_key: str,
+            max_connections: int,
+            max_keepalive: int,
+            request_timeout: float
+    ):
+        # One long-lived pool shared by every agent, so concurrent LLM calls
+        # reuse warm keep-alive connections instead of new TLS handshakes
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            timeout=httpx.Timeout(request_timeout),
+            http2=True,
+            verify=_SSL_CONTEXT
+        )
+        self.model_client = OpenAIChatCompletionClient(
+            model=model_name,
+            api_key=api_key,
+            http_client=self.http
+        )
+        self.users = 0
+
+    async def close(self) -> None:
+        await self.model_client.close()
+        await self.http.aclose()
+
+
+# (model_name, api_key, max_connections, max_keepalive, request_timeout)
+# -> shared client, closed when its last user cleans up
+_ClientKey = Tuple[str, str, int, int, float]
+_CLIENT_CACHE: Dict[_ClientKey, _SharedModelClient] = {}
+
+
+def _acquire_model_client(key: _ClientKey) -> _SharedModelClient:
+    shared = _CLIENT_CACHE.get(key)
+    if shared is None:
+        shared = _CLIENT_CACHE[key] = _SharedModelClient(*key)
+    shared.users += 1
+    return shared
+
+
+async def _release_model_client(key: _ClientKey) -> None:
+    shared = _CLIENT_CACHE.get(key)
+    if shared is None:
+        return
+    shared.users -= 1
+    if shared.users == 0:
+        del _CLIENT_CACHE[key]
+        await shared.close()
+
+
+class _TTLStore(CacheStore[CHAT_CACHE_VALUE_TYPE]):
+    """In-memory LRU cache store whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.store: "OrderedDict[str, Tuple[float, CHAT_CACHE_VALUE_TYPE]]" = OrderedDict()
+
+    def get(self, key: str, default: Optional[CHAT_CACHE_VALUE_TYPE] = None) -> Optional[CHAT_CACHE_VALUE_TYPE]:
+        hit = self.store.get(key)
+        if hit is None:
+            return default
+        if time.monotonic() - hit[0] >= self.ttl:
+            del self.store[key]
+            return default
+        self.store.move_to_end(key)
+        return hit[1]
+
+    def set(self, key: str, value: CHAT_CACHE_VALUE_TYPE) -> None:
+        self.store[key] = (time.monotonic(), value)
+        self.store.move_to_end(key)
+        while len(self.store) > self.max_size:
+            self.store.popitem(last=False)
 
 
 class MultiAgentSystem:
@@ -13,23 +110,45 @@ class MultiAgentSystem:
     Main class that orchestrates the multi-agent financial analysis system.
     """
 
+    _TASK_TMPL = (
+        "Provide an analysis for {t}'s performance today "
+        "based on both news sentiment and technical analysis."
+    )
+
     def __init__(
             self,
             model_name: str = "gpt-4o-mini",
             max_turns: int = 6,
-            mcp_server_url: Optional[str] = None
+            mcp_server_url: Optional[str] = None,
+            cache_ttl: float = 0.0,
+            max_connections: int = 512,
+            max_keepalive: int = 256,
+            request_timeout: float = 120.0,
+            mcp_pool_size: Optional[int] = None
     ):
         """
         Initialize the multi-agent system.
 
         Args:
             model_name: OpenAI model to use (default: gpt-4o-mini)
-            max_turns: Maximum number of turns in the group chat
+            max_turns: Maximum number of turns the orchestrator takes to reach a verdict
             mcp_server_url: MCP server URL (if None, will use environment variable or default)
+            cache_ttl: Seconds to reuse an identical model request's response (default 0,
+                disabled). Responses are sampled at the model's default temperature, so
+                enabling it replays the same sampled answers, verdict included, for that long
+            max_connections: Maximum number of concurrent connections to the OpenAI API
+            max_keepalive: Maximum number of idle OpenAI connections kept open for reuse
+            request_timeout: Timeout in seconds for each OpenAI request
+            mcp_pool_size: MCP server connection pool size (if None, will use environment variable or default);
+                ignored, with a warning, if the shared MCP executor already exists
         """
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.model_name = model_name
         self.max_turns = max_turns
+        self.cache_ttl = cache_ttl
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.request_timeout = request_timeout
 
         if not self.openai_api_key:
             raise ValueError(
@@ -40,14 +159,43 @@ class MultiAgentSystem:
         elif not os.getenv("MCP_SERVER_URL"):
             os.environ["MCP_SERVER_URL"] = "http://localhost:8000"
 
-        self.model_client = OpenAIChatCompletionClient(
-            model=self.model_name,
-            api_key=self.openai_api_key
+        # Created now so the pool size applies before any tool or warmup call
+        get_mcp_executor(pool_size=mcp_pool_size)
+
+        self._client_key = (
+            self.model_name, self.openai_api_key, max_connections, max_keepalive, request_timeout
         )
+        shared_client = _acquire_model_client(self._client_key)
+        self._http = shared_client.http
+        self.model_client = shared_client.model_client
+        self._client_released = False
+
+        # Opt-in: identical requests (same messages and tools) within cache_ttl
+        # get the stored response, e.g. re-analyzing a ticker whose tool data
+        # is unchanged
+        if self.cache_ttl > 0:
+            self.model_client = ChatCompletionCache(self.model_client, _TTLStore(self.cache_ttl))
 
         self.agent_factory = AgentFactory(self.model_client)
         self.agents = self._create_agents()
-        self.team = self._create_team()
+        self.dag = self._create_dag()
+
+        # Open the OpenAI and MCP connections in the background so the first
+        # analysis does not pay for the TCP/TLS handshakes
+        try:
+            self._warmup = asyncio.get_running_loop().create_task(self._warm_connections())
+        except RuntimeError:
+            self._warmup = None
+
+    async def _warm_connections(self) -> None:
+        """Make one cheap request to each endpoint to get its connection pooled."""
+        mcp_executor = get_mcp_executor()
+        await mcp_executor.ensure_connection()
+        await asyncio.gather(
+            self._http.head(os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1") + "/models"),
+            mcp_executor.client.get("/health"),
+            return_exceptions=True
+        )
 
     def _create_agents(self) -> Dict[str, AssistantAgent]:
         """Create all agents for the system."""
@@ -57,45 +205,143 @@ class MultiAgentSystem:
             "orchestrator": self.agent_factory.create_orchestrator("Orchestrator")
         }
 
-    def _create_team(self) -> RoundRobinGroupChat:
-        """Create the team with all agents."""
-        participants = list(self.agents.values())
-
-        return RoundRobinGroupChat(
-            participants=participants,
-            max_turns=self.max_turns,
-            termination_condition=TextMentionTermination("FINAL VERDICT")
+    def _create_dag(self, agents: Optional[Dict[str, AssistantAgent]] = None) -> AgentDAG:
+        """Create the DAG: both analysts run concurrently, then the orchestrator."""
+        agents = agents or self.agents
+        return AgentDAG(
+            agents=agents,
+            deps={
+                "sentiment_analyst": set(),
+                "technical_analyst": set(),
+                "orchestrator": {"sentiment_analyst", "technical_analyst"}
+            },
+            terminations={
+                "orchestrator": TextMentionTermination("FINAL VERDICT", sources=[agents["orchestrator"].name])
+            },
+            max_turns=self.max_turns
         )
 
-    async def analyze_stock(self, ticker: str) -> dict:
+    async def analyze_stock(self, ticker: str) -> TaskResult:
         """
         Perform comprehensive stock analysis using multiple agents.
 
+        The sentiment and technical analysts work concurrently; the orchestrator
+        then synthesizes both analyses into a final verdict.
+
         Args:
             ticker: Stock ticker symbol (e.g., 'AAPL', 'MSFT')
 
         Returns:
-            Analysis result
+            Analysis result, ending with the orchestrator's final verdict
         """
-        task = (
-            f"Provide an analysis for {ticker}'s performance today "
-            f"based on both news sentiment and technical analysis."
-        )
+        return await self._analyze(ticker)
+
+    async def analyze_stocks(
+            self,
+            tickers: List[str],
+            max_concurrency: int = 16
+    ) -> Dict[str, Union[TaskResult, BaseException]]:
+        """
+        Analyze several stocks concurrently.
+
+        Each ticker gets its own agents, so analyses do not share conversation
+        history. At most max_concurrency analyses run at once, keeping the
+        number of concurrent model requests well below the connection pool size.
+
+        Args:
+            tickers: Stock ticker symbols (e.g., ['AAPL', 'MSFT'])
+            max_concurrency: Maximum number of tickers analyzed at the same time
+
+        Returns:
+            Ticker -> its analysis result, or the exception that ended it
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze_one(ticker: str) -> TaskResult:
+            async with semaphore:
+                return await self._analyze(ticker, dag=self._create_dag(self._create_agents()))
 
-        print(f"Starting analysis for {ticker}...")
+        tickers = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(*(analyze_one(ticker) for ticker in tickers), return_exceptions=True)
+        return dict(zip(tickers, results))
 
+    async def analyze_stock_stream(self, ticker: str) -> AsyncIterator[str]:
+        """
+        Perform the same analysis as analyze_stock, yielding the orchestrator's
+        output token by token as it is generated.
+
+        The orchestrator may take several turns before giving its final verdict;
+        turns are separated by a blank line and the verdict is in the last one.
+
+        Args:
+            ticker: Stock ticker symbol (e.g., 'AAPL', 'MSFT')
+
+        Yields:
+            Chunks of the orchestrator's output
+        """
+        chunks: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        analysis = asyncio.ensure_future(self._analyze(ticker, chunks))
+        analysis.add_done_callback(lambda _: chunks.put_nowait(None))
         try:
-            result = await self.team.run(task=task)
-            print(f"\nAnalysis completed for {ticker}")
-            return result
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                yield chunk
+            # Re-raise any error from the analysis
+            await analysis
+        finally:
+            if not analysis.done():
+                analysis.cancel()
+
+    async def _analyze(
+            self,
+            ticker: str,
+            chunks: Optional["asyncio.Queue[str]"] = None,
+            dag: Optional[AgentDAG] = None
+    ) -> TaskResult:
+        task = self._TASK_TMPL.format(t=ticker)
+
+        logger.info("Starting analysis for %s...", ticker, extra={"ticker": ticker})
+
+        try:
+            if dag is None:
+                dag = self.dag
+                await dag.reset()
+            # A stuck tool call or model request must not hang the analysis
+            # and hold its pooled connections indefinitely
+            timeout = self.max_turns * TIMEOUT_PER_TURN
+            try:
+                async with asyncio.timeout(timeout):
+                    results = await dag.run(task, chunks)
+            except TimeoutError:
+                raise TimeoutError(f"Analysis for {ticker} did not finish within {timeout} seconds") from None
+
+            verdict = results["orchestrator"]
+            if isinstance(verdict, BaseException):
+                raise verdict
+            logger.info("Analysis completed for %s", ticker, extra={"ticker": ticker})
+
+            messages = [
+                message
+                for result in results.values() if isinstance(result, TaskResult)
+                for message in result.messages
+            ]
+            return TaskResult(messages=messages, stop_reason=verdict.stop_reason)
 
         except Exception as e:
-            print(f"Error during analysis: {str(e)}")
+            logger.error("Error during analysis of %s: %s", ticker, e, extra={"ticker": ticker})
             raise
 
     async def cleanup(self) -> None:
         """Clean up resources."""
+        if self._warmup is not None and not self._warmup.done():
+            self._warmup.cancel()
+            await asyncio.gather(self._warmup, return_exceptions=True)
         await cleanup_mcp_executor()
+        if not self._client_released:
+            self._client_released = True
+            await _release_model_client(self._client_key)
 
     def list_agents(self) -> List[str]:
         """Get list of all agent names."""
@@ -106,6 +352,11 @@ class MultiAgentSystem:
         return {
             "model_name": self.model_name,
             "max_turns": self.max_turns,
+            "cache_ttl": self.cache_ttl,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "request_timeout": self.request_timeout,
             "agents": self.list_agents(),
-            "mcp_server_url": os.getenv("MCP_SERVER_URL", "http://localhost:8000")
+            "mcp_server_url": os.getenv("MCP_SERVER_URL", "http://localhost:8000"),
+            "mcp_pool_size": get_mcp_executor().pool_size
         }
\ No newline at end of file
@@ -1,10 +1,139 @@
 import asyncio
-from typing import Any, Coroutine
+import functools
+import time
+from collections import OrderedDict
+import msgspec
+from typing import Dict, List, Optional, Set, Tuple
 from mcp_executor import get_mcp_executor
 
+TOOL_CACHE_TTL = 60
 
-def _handle_async_call(coro: Coroutine) -> Any:
-    return asyncio.run(coro)
+# Batch keys are arbitrary symbol lists, so the cache is bounded; the least
+# recently used entries are evicted first
+TOOL_CACHE_SIZE = 256
+
+# Tool calls issued within this many seconds of each other are sent to the
+# MCP server as one JSON-RPC batch
+BATCH_WINDOW = 0.005
+
+# (tool name, ticker key) -> (timestamp, result)
+_TOOL_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+# (tool name, ticker key) -> task of the call currently fetching it
+_INFLIGHT: Dict[Tuple[str, str], asyncio.Task] = {}
+
+# (tool name, arguments, future) waiting for the next batch
+_PENDING: List[Tuple[str, dict, asyncio.Future]] = []
+
+# Batch senders in flight; the loop only keeps weak references to tasks
+_SENDERS: Set[asyncio.Task] = set()
+
+
+def _is_cacheable(result: str) -> bool:
+    """
+    Only successful tool payloads are cached: a JSON object, or array of
+    objects, without "errors". Error and fallback messages from the executor
+    are plain text and are retried on the next call.
+    """
+    try:
+        payload = msgspec.json.decode(result)
+    except msgspec.DecodeError:
+        return False
+    if isinstance(payload, dict):
+        payload = [payload]
+    return isinstance(payload, list) and all(
+        isinstance(item, dict) and "errors" not in item for item in payload
+    )
+
+
+def _cache_get(cache_key: Tuple[str, str]) -> Optional[str]:
+    hit = _TOOL_CACHE.get(cache_key)
+    if hit is None:
+        return None
+    if time.monotonic() - hit[0] >= TOOL_CACHE_TTL:
+        del _TOOL_CACHE[cache_key]
+        return None
+    _TOOL_CACHE.move_to_end(cache_key)
+    return hit[1]
+
+
+def _cache_put(cache_key: Tuple[str, str], result: str) -> None:
+    _TOOL_CACHE[cache_key] = (time.monotonic(), result)
+    _TOOL_CACHE.move_to_end(cache_key)
+    while len(_TOOL_CACHE) > TOOL_CACHE_SIZE:
+        _TOOL_CACHE.popitem(last=False)
+
+
+def _settle(batch: List[Tuple[str, dict, asyncio.Future]], results=None, error=None) -> None:
+    for index, (_, _, future) in enumerate(batch):
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(results[index])
+
+
+async def _send_batch() -> None:
+    """Wait BATCH_WINDOW seconds, then send every queued call as one batch."""
+    await asyncio.sleep(BATCH_WINDOW)
+    batch = _PENDING[:]
+    _PENDING.clear()
+    try:
+        results = await get_mcp_executor().call_tools_batch(
+            [(call_name, call_arguments) for call_name, call_arguments, _ in batch]
+        )
+    except Exception as e:
+        _settle(batch, error=e)
+    except BaseException:
+        # Callers must not wait forever on a batch that was never sent
+        _settle(batch, error=RuntimeError("MCP batch cancelled"))
+        raise
+    else:
+        _settle(batch, results)
+
+
+async def _call_tool_batched(name: str, arguments: dict) -> str:
+    """
+    Call an MCP tool, coalescing it with other calls made within BATCH_WINDOW.
+
+    The first call of a window starts a sender task that no caller owns, so
+    cancelling any caller only abandons that caller's own result.
+    """
+    future = asyncio.get_running_loop().create_future()
+    _PENDING.append((name, arguments, future))
+    if len(_PENDING) == 1:
+        sender = asyncio.ensure_future(_send_batch())
+        _SENDERS.add(sender)
+        sender.add_done_callback(_SENDERS.discard)
+    return await future
+
+
+def _finish_call(cache_key: Tuple[str, str], call: asyncio.Task) -> None:
+    """Done callback of a shared call: cache a successful result and retire it."""
+    _INFLIGHT.pop(cache_key, None)
+    # exception() also marks a failure as retrieved when every caller gave up
+    if not call.cancelled() and call.exception() is None and _is_cacheable(call.result()):
+        _cache_put(cache_key, call.result())
+
+
+async def _call_tool_cached(name: str, arguments: dict, key: str) -> str:
+    """
+    Call an MCP tool, reusing a result from the last TOOL_CACHE_TTL seconds.
+
+    Concurrent calls for the same tool and key share a single in-flight
+    request, run in a task no caller owns: every caller awaits its result,
+    errors included, and a cancelled caller only gives up its own result.
+    """
+    cache_key = (name, key)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    call = _INFLIGHT.get(cache_key)
+    if call is None:
+        call = _INFLIGHT[cache_key] = asyncio.ensure_future(_call_tool_batched(name, arguments))
+        call.add_done_callback(functools.partial(_finish_call, cache_key))
+    return await asyncio.shield(call)
 
 
 async def news_sentiment_tool(ticker_symbol: str) -> str:
@@ -18,11 +147,9 @@ async def news_sentiment_tool(ticker_symbol: str) -> str:
         str: News sentiment analysis results
     """
     try:
-        mcp_executor = get_mcp_executor()
-        result = await mcp_executor.call_tool(
-            "news_sentiment_tool", {"ticker_symbol": ticker_symbol}
+        return await _call_tool_cached(
+            "news_sentiment_tool", {"ticker_symbol": ticker_symbol}, ticker_symbol.upper()
         )
-        return result
     except Exception as e:
         return f"Error in news_sentiment_tool: {str(e)}"
 
@@ -38,10 +165,46 @@ async def technical_analysis_tool(ticker_symbol: str) -> str:
         str: Technical analysis indicators
     """
     try:
-        mcp_executor = get_mcp_executor()
-        result = await mcp_executor.call_tool(
-            "technical_analysis_tool", {"ticker_symbol": ticker_symbol}
+        return await _call_tool_cached(
+            "technical_analysis_tool", {"ticker_symbol": ticker_symbol}, ticker_symbol.upper()
         )
-        return result
     except Exception as e:
         return f"Error in technical_analysis_tool: {str(e)}"
+
+
+async def full_analysis_tool(ticker_symbol: str) -> str:
+    """
+    Get both news sentiment and technical analysis for a given stock ticker.
+
+    Args:
+        ticker_symbol (str): Stock ticker symbol (e.g., 'AAPL', 'MSFT')
+
+    Returns:
+        str: News articles and technical analysis indicators
+    """
+    try:
+        return await _call_tool_cached(
+            "full_analysis_tool", {"ticker_symbol": ticker_symbol}, ticker_symbol.upper()
+        )
+    except Exception as e:
+        return f"Error in full_analysis_tool: {str(e)}"
+
+
+async def batch_technical_analysis_tool(ticker_symbols: List[str]) -> str:
+    """
+    Perform technical analysis for several stock tickers in one call.
+
+    Args:
+        ticker_symbols (List[str]): Stock ticker symbols (e.g., ['AAPL', 'MSFT'])
+
+    Returns:
+        str: Technical analysis indicators for each ticker
+    """
+    try:
+        return await _call_tool_cached(
+            "batch_technical_analysis_tool",
+            {"ticker_symbols": ticker_symbols},
+            ",".join(sorted(symbol.upper() for symbol in ticker_symbols))
+        )
+    except Exception as e:
+        return f"Error in batch_technical_analysis_tool: {str(e)}"
@@ -0,0 +1,346 @@
+import numpy as np
+import httpx
+import msgspec
+from typing import Dict, Any, Tuple
+from collections import OrderedDict
+import asyncio
+import functools
+import threading
+import time
+from urllib.parse import quote
+
+NEWS_CACHE_TTL = 5 * 60
+TECHNICAL_CACHE_TTL = 60 * 60
+
+# Tickers come from clients, so the cache is bounded; the least recently
+# used entries are evicted first
+TICKER_CACHE_SIZE = 1024
+
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+
+YAHOO_POOL_SIZE = 20
+
+# Shared across requests so connections to Yahoo stay alive between fetches;
+# over HTTP/2 concurrent fetches are multiplexed on the same connection.
+# Yahoo answers requests without a browser User-Agent with 429s.
+_YAHOO_CLIENT = httpx.Client(
+    timeout=15.0,
+    headers={"User-Agent": "Mozilla/5.0"},
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(
+            max_connections=YAHOO_POOL_SIZE,
+            max_keepalive_connections=YAHOO_POOL_SIZE
+        )
+    )
+)
+
+# Yahoo rejects overly long symbol lists in a single download request
+BATCH_DOWNLOAD_SIZE = 20
+
+# After this many consecutive failures of one kind of fetch, Yahoo is left
+# alone for BREAKER_COOLDOWN seconds and the last good results are served
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30
+
+# (fetcher, ticker) -> (timestamp, result). Expired entries are kept, within
+# TICKER_CACHE_SIZE, as the last known good result for the circuit breaker.
+_TICKER_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+_BREAKER_LOCK = threading.Lock()
+_FAIL_COUNT: Dict[str, int] = {}
+_BREAKER_OPEN_UNTIL: Dict[str, float] = {}
+
+
+def _cache_get(key, ttl):
+    with _CACHE_LOCK:
+        hit = _TICKER_CACHE.get(key)
+        if hit is not None:
+            _TICKER_CACHE.move_to_end(key)
+    if hit is not None and time.monotonic() - hit[0] < ttl:
+        return True, hit[1]
+    return False, None
+
+
+def _cache_put(key, result):
+    with _CACHE_LOCK:
+        _TICKER_CACHE[key] = (time.monotonic(), result)
+        _TICKER_CACHE.move_to_end(key)
+        while len(_TICKER_CACHE) > TICKER_CACHE_SIZE:
+            _TICKER_CACHE.popitem(last=False)
+
+
+def _breaker_open(kind):
+    return time.monotonic() < _BREAKER_OPEN_UNTIL.get(kind, 0.0)
+
+
+def _record_failure(kind):
+    with _BREAKER_LOCK:
+        _FAIL_COUNT[kind] = _FAIL_COUNT.get(kind, 0) + 1
+        if _FAIL_COUNT[kind] >= BREAKER_FAILURE_THRESHOLD:
+            _BREAKER_OPEN_UNTIL[kind] = time.monotonic() + BREAKER_COOLDOWN
+            _FAIL_COUNT[kind] = 0
+
+
+def _record_success(kind):
+    with _BREAKER_LOCK:
+        _FAIL_COUNT[kind] = 0
+
+
+def _last_good(fetcher_name, ticker_symbol):
+    """Return the most recent cached result for a ticker, however old."""
+    with _CACHE_LOCK:
+        hit = _TICKER_CACHE.get((fetcher_name, ticker_symbol.upper()))
+    if hit is None:
+        raise RuntimeError("Yahoo Finance is currently unavailable, please retry shortly")
+    return hit[1]
+
+
+def _is_upstream_failure(error):
+    """Whether an error means Yahoo itself is failing, rather than the request.
+
+    Unknown tickers (4xx responses, missing data) say nothing about Yahoo's
+    health and must not open the breaker for every other client.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return not isinstance(error, (ValueError, LookupError))
+
+
+def _cached(ttl, kind):
+    """Cache the result of a per-ticker fetch for `ttl` seconds.
+
+    Cache misses run behind the circuit breaker for `kind`: while it is open
+    Yahoo is not contacted at all and the last good result for the ticker is
+    returned instead. Exceptions are not cached, so a failed fetch is retried
+    on the next call.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(ticker_symbol):
+            key = (func.__name__, ticker_symbol.upper())
+            found, result = _cache_get(key, ttl)
+            if found:
+                return result
+            if _breaker_open(kind):
+                return _last_good(func.__name__, ticker_symbol)
+            try:
+                result = func(ticker_symbol)
+            except Exception as e:
+                if _is_upstream_failure(e):
+                    _record_failure(kind)
+                raise
+            _record_success(kind)
+            _cache_put(key, result)
+            return result
+        return wrapper
+    return decorator
+
+
+@_cached(NEWS_CACHE_TTL, "news")
+def _fetch_news(ticker_symbol):
+    import yfinance as yf
+
+    ticker = yf.Ticker(ticker_symbol)
+    news = ticker.news or []
+
+    # Items without content would reach the agent as blank articles
+    return [
+        {"title": content.get('title', ''), "summary": content.get('summary', '')}
+        for item in news
+        for content in (item.get('content'),)
+        if content
+    ]
+
+
+def _jit(func):
+    """Compile `func` with numba on its first call, if numba is installed.
+
+    numba is imported lazily so workers and requests that never compute
+    indicators do not pay for loading it.
+    """
+    compiled = None
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        nonlocal compiled
+        if compiled is None:
+            try:
+                from numba import njit
+            except ImportError:
+                compiled = func
+            else:
+                compiled = njit(cache=True)(func)
+        return compiled(*args)
+    return wrapper
+
+
+@_jit
+def _sma_last(close, window):
+    """Mean of the trailing `window` values, NaN if there is not enough data."""
+    if close.size < window:
+        return np.nan
+    return close[close.size - window:].mean()
+
+
+@_jit
+def _rsi_last(close, period):
+    """RSI over the trailing `period` price changes, using simple averages."""
+    if close.size <= period:
+        return np.nan
+    delta = np.diff(close[close.size - period - 1:])
+    gain = np.maximum(delta, 0.0).sum()
+    loss = -np.minimum(delta, 0.0).sum()
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+@_jit
+def _macd_last(close, fast, slow, signal):
+    """Last MACD, signal and histogram values in a single pass over `close`."""
+    a_fast = 2.0 / (fast + 1)
+    a_slow = 2.0 / (slow + 1)
+    a_signal = 2.0 / (signal + 1)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    macd_signal = 0.0
+    for i in range(1, close.size):
+        ema_fast = a_fast * close[i] + (1 - a_fast) * ema_fast
+        ema_slow = a_slow * close[i] + (1 - a_slow) * ema_slow
+        macd_signal = a_signal * (ema_fast - ema_slow) + (1 - a_signal) * macd_signal
+    macd = ema_fast - ema_slow
+    return macd, macd_signal, macd - macd_signal
+
+
+def _latest_indicators(close: np.ndarray) -> dict:
+    """Compute the latest SMA50, SMA200, RSI(14) and MACD(12, 26, 9) values.
+
+    Only the terminal value of each indicator is needed, so nothing is computed
+    over the full rolling window series.
+    """
+    macd, macd_signal, macd_hist = _macd_last(close, 12, 26, 9)
+
+    return {
+        "SMA50": float(_sma_last(close, 50)),
+        "SMA200": float(_sma_last(close, 200)),
+        "RSI": float(_rsi_last(close, 14)),
+        "MACD": float(macd),
+        "MACD_signal": float(macd_signal),
+        "MACD_hist": float(macd_hist),
+    }
+
+
+def _indicators_from_close(ticker_symbol, close):
+    close = close[~np.isnan(close)]
+    if close.size == 0:
+        raise ValueError(f"No price history available for {ticker_symbol}")
+    return _latest_indicators(close)
+
+
+def _fetch_close_prices(ticker_symbol):
+    """Fetch one year of daily adjusted closes straight from Yahoo's chart API.
+
+    Skips building a DataFrame; missing bars come back as NaN.
+    """
+    response = _YAHOO_CLIENT.get(
+        # Escaped so a ticker cannot change the request path
+        YAHOO_CHART_URL.format(ticker=quote(ticker_symbol, safe="")),
+        params={"range": "1y", "interval": "1d"}
+    )
+    response.raise_for_status()
+    chart = msgspec.json.decode(response.content)["chart"]
+    if chart.get("error"):
+        raise ValueError(chart["error"].get("description", "Unknown chart error"))
+
+    indicators = chart["result"][0]["indicators"]
+    if indicators.get("adjclose"):
+        values = indicators["adjclose"][0]["adjclose"]
+    else:
+        values = indicators["quote"][0]["close"]
+    return np.asarray(values, dtype=np.float64)
+
+
+@_cached(TECHNICAL_CACHE_TTL, "technical")
+def _fetch_technical(ticker_symbol):
+    return _indicators_from_close(ticker_symbol, _fetch_close_prices(ticker_symbol))
+
+
+def fetch_news_sentiment(ticker_symbol):
+    """Fetch news articles for a given ticker symbol"""
+    try:
+        return _fetch_news(ticker_symbol)
+    except Exception as e:
+        return f"Error fetching news articles: {str(e)}"
+
+
+def fetch_technical_analysis(ticker_symbol):
+    """Fetch technical analysis indicators for a given ticker symbol"""
+    try:
+        return _fetch_technical(ticker_symbol)
+    except Exception as e:
+        return f"Error fetching technical analysis: {str(e)}"
+
+
+def fetch_technical_analysis_batch(ticker_symbols):
+    """Fetch technical analysis indicators for several ticker symbols at once.
+
+    Symbols missing from the cache are downloaded together, in chunks of at most
+    BATCH_DOWNLOAD_SIZE symbols per Yahoo request.
+    """
+    import yfinance as yf
+
+    results = {}
+    missing = []
+    for symbol in dict.fromkeys(t.upper() for t in ticker_symbols):
+        found, result = _cache_get((_fetch_technical.__name__, symbol), TECHNICAL_CACHE_TTL)
+        if found:
+            results[symbol] = result
+        else:
+            missing.append(symbol)
+
+    for start in range(0, len(missing), BATCH_DOWNLOAD_SIZE):
+        chunk = missing[start:start + BATCH_DOWNLOAD_SIZE]
+        if _breaker_open("technical"):
+            for symbol in chunk:
+                try:
+                    results[symbol] = _last_good(_fetch_technical.__name__, symbol)
+                except Exception as e:
+                    results[symbol] = f"Error fetching technical analysis: {str(e)}"
+            continue
+
+        try:
+            data = yf.download(chunk, period="1y", group_by="ticker", threads=True, progress=False)
+        except Exception as e:
+            if _is_upstream_failure(e):
+                _record_failure("technical")
+            for symbol in chunk:
+                results[symbol] = f"Error fetching technical analysis: {str(e)}"
+            continue
+
+        # yf.download does not raise for symbols it failed to fetch, so only
+        # data actually received shows that Yahoo is answering
+        received = False
+        for symbol in chunk:
+            try:
+                close = data[symbol]["Close"].to_numpy(np.float64)
+                results[symbol] = _indicators_from_close(symbol, close)
+                _cache_put((_fetch_technical.__name__, symbol), results[symbol])
+                received = True
+            except Exception as e:
+                results[symbol] = f"Error fetching technical analysis: {str(e)}"
+        if received:
+            _record_success("technical")
+
+    return results
+
+
+async def full_analysis(ticker_symbol):
+    """Fetch news articles and technical indicators for a ticker concurrently"""
+    return await asyncio.gather(
+        asyncio.to_thread(fetch_news_sentiment, ticker_symbol),
+        asyncio.to_thread(fetch_technical_analysis, ticker_symbol)
+    )